@@ -1,14 +1,164 @@
 #!/usr/bin/env python3
+import asyncio
 import json
 import sys
 import os
+import select
+import signal
+import socket
 import time
 import subprocess
 import argparse
-from typing import Any, Dict, List, Optional, Union
-from dataclasses import dataclass
+import contextlib
+import fcntl
+import functools
+import hashlib
+import itertools
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import asdict, dataclass
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is an optional speedup; both paths produce/accept UTF-8 bytes (or a
+# memoryview of them) so the server pipes can stay binary. orjson.JSONDecodeError subclasses
+# json.JSONDecodeError, so callers only need to catch the stdlib type.
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=asdict).encode()
+
+    def _loads(data: Union[bytes, memoryview]) -> Any:
+        return json.loads(bytes(data))
+
+_HOME = os.path.expanduser("~")
+_MCP_DIRS = tuple(
+    os.path.join(_HOME, "Developer", ".mcp", *sub)
+    for sub in ((), ("logs",), ("knowledge_graph",), ("thoughts",))
+)
+# Where the shared server daemon listens, and where its output goes
+_SOCKET_PATH = os.path.join(_MCP_DIRS[0], "mcp.sock")
+# Held while a client decides whether to start (or restart) the daemon
+_DAEMON_LOCK = _SOCKET_PATH + ".lock"
+# "<pid> <stamp>" of the daemon this client last started; see _daemon_stamp
+_DAEMON_PID = _SOCKET_PATH + ".pid"
+_DAEMON_LOG = os.path.join(_MCP_DIRS[1], "mcp-daemon.log")
+
+# Variables layered over the caller's environment when launching the server
+_MCP_ENV_OVERLAY = {
+    "RUST_LOG": "mcp_tools=debug,info",
+    "RUST_BACKTRACE": "1",
+    "LOG_DIR": _MCP_DIRS[1],
+    "KNOWLEDGE_GRAPH_DIR": _MCP_DIRS[2],
+    "THOUGHTS_DIR": _MCP_DIRS[3],
+}
+
+# Variables the server reads at startup (the env::var calls in mcp_tools/src);
+# a daemon started with other values is restarted
+_DAEMON_ENV_KEYS = (
+    "AIDER_API_KEY", "AIDER_MODEL", "BRAVE_API_KEY", "GOOGLE_OAUTH_CLIENT_ID",
+    "GOOGLE_OAUTH_CLIENT_SECRET", "GOOGLE_OAUTH_REDIRECT_URI", "NEVERBOUNCE_API_KEY",
+    "OPENAI_API_KEY", "ORACLE_CONNECT_STRING", "ORACLE_PASSWORD", "ORACLE_USER",
+    "SCRAPINGBEE_API_KEY",
+)
+
+# Sent as the startup handshake; the server answers once it is ready to serve
+_INITIALIZE_PARAMS = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {},
+    "clientInfo": {"name": "mcp_client.py", "version": "0.1.0"},
+}
+
+# sequential_thinking CLI action -> (server action, params builder)
+_THINK_DISPATCH = {
+    "add": ("add_thought", lambda p: {
+        "content": p.get("content"),
+        "total_thoughts": int(p.get("total", 1))
+    }),
+    "revise": ("revise_thought", lambda p: {
+        "content": p.get("content"),
+        "revises_number": int(p.get("revises"))
+    }),
+    "branch": ("branch_thought", lambda p: {
+        "content": p.get("content"),
+        "branch_from": int(p.get("branch_from")),
+        "branch_id": p.get("branch_id")
+    }),
+}
+
+def _try_connect_daemon() -> Optional[socket.socket]:
+    """Connect to the daemon socket, or return None if nothing is listening"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(_SOCKET_PATH)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
+
+@contextlib.contextmanager
+def _daemon_lock():
+    """Hold the lock that serializes starting and stopping the daemon"""
+    with open(_DAEMON_LOCK, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+def _read_daemon_pid() -> Tuple[Optional[int], Optional[str]]:
+    """Return the pid and stamp recorded for the daemon, or (None, None)"""
+    try:
+        with open(_DAEMON_PID) as f:
+            pid, stamp = f.read().split()
+        return int(pid), stamp
+    except (OSError, ValueError):
+        return None, None
+
+def _stop_daemon(timeout: float = 5.0) -> bool:
+    """
+    Stop the recorded daemon and wait until its socket stops accepting
+
+    Call with _daemon_lock() held. Returns False if it was not running.
+    """
+    pid, _ = _read_daemon_pid()
+    # The record is dropped only once the daemon is gone: until then, clients
+    # that see it outdated wait on the lock instead of connecting to it
+    try:
+        sock = _try_connect_daemon()
+        if pid is None or sock is None:
+            # Only signal the pid while its socket is live, in case it was reused
+            if sock is not None:
+                sock.close()
+            return False
+        sock.close()
+
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return False
+        deadline = time.monotonic() + timeout
+        while True:
+            sock = _try_connect_daemon()
+            if sock is None:
+                return True
+            sock.close()
+            if deadline is not None and time.monotonic() >= deadline:
+                # Still serving after SIGTERM
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGKILL)
+                deadline = None
+            time.sleep(0.01)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(_DAEMON_PID)
+
+def _is_notification(message: Dict[str, Any]) -> bool:
+    """True for server messages that answer no request (e.g. progress updates)"""
+    return message.get("id") is None and "error" not in message
+
 class MCPError(Exception):
     """Base exception for MCP client errors"""
     pass
@@ -17,103 +167,145 @@ class ToolError(MCPError):
     """Raised when a tool operation fails"""
     pass
 
+def _unmatched_response_error(message: Dict[str, Any]) -> MCPError:
+    """Error for a response whose id matches no request that is waiting"""
+    if "error" in message:
+        # The server answers requests it cannot parse with an id of its own
+        return MCPError(f"Server rejected request: {message['error']}")
+    return MCPError(f"Unexpected response from server: {message}")
+
 @dataclass
 class JsonRpcRequest:
+    """JSON-RPC request envelope, encoded directly by _dumps"""
     method: str
     params: Dict[str, Any]
-    id: int = 1
     jsonrpc: str = "2.0"
+    id: int = 1
+
+# Methods this client sends; their constant envelope prefix is encoded once
+_METHODS = (
+    "initialize", "sequential_thinking", "memory", "graph_tool",
+    "task_planning", "brave_search", "scrape_url", "git",
+)
+_PREFIX = {m: b'{"jsonrpc":"2.0","method":' + _dumps(m) + b',"params":' for m in _METHODS}
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "jsonrpc": self.jsonrpc,
-            "method": self.method,
-            "params": self.params,
-            "id": self.id
-        }
-
-class MCPClient:
-    def __init__(self, host: str = "localhost", port: int = 3000):
-        self._request_id = 0
+def _encode_request(method: str, params: Dict[str, Any], request_id: int) -> Tuple[bytes, ...]:
+    """
+    Encode a newline-terminated JSON-RPC request as a sequence of byte chunks
+
+    Known methods reuse their pre-encoded envelope prefix, so only the params
+    and id are serialized per call. The chunks are meant for a vectored write.
+    """
+    prefix = _PREFIX.get(method)
+    if prefix is None:
+        return _dumps(JsonRpcRequest(method=method, params=params, id=request_id)), b"\n"
+    return prefix, _dumps(params), b',"id":%d}\n' % request_id
+
+class _BaseMCPClient:
+    """
+    Setup and tool methods shared by MCPClient and AsyncMCPClient
+
+    Subclasses provide the transport through _make_request; the tool methods
+    return whatever it returns (a result dict, or an awaitable for one).
+    """
+
+    # Set once the ~/Developer/.mcp tree has been created in this process
+    _dirs_ready = False
+    # Seconds to wait for the server to answer the startup handshake
+    _STARTUP_TIMEOUT = 5.0
+
+    def __init__(self, host: str = "localhost", port: int = 3000, daemon: bool = False):
+        """
+        With daemon=True the client connects to a shared background server
+        on _SOCKET_PATH (starting it on first use) instead of spawning a
+        private server process, so later invocations skip server startup.
+        """
+        self._next_id = itertools.count(1).__next__
         self._server_process = None
+        self._daemon = daemon
         self._ensure_directories()
 
     def _ensure_directories(self):
         """Ensure required directories exist"""
-        home = os.path.expanduser("~")
-        dirs = [
-            os.path.join(home, "Developer", ".mcp"),
-            os.path.join(home, "Developer", ".mcp", "logs"),
-            os.path.join(home, "Developer", ".mcp", "knowledge_graph"),
-            os.path.join(home, "Developer", ".mcp", "thoughts")
-        ]
-        for d in dirs:
+        if _BaseMCPClient._dirs_ready:
+            return
+        for d in _MCP_DIRS:
             os.makedirs(d, exist_ok=True)
+        _BaseMCPClient._dirs_ready = True
 
-    def _ensure_server_running(self):
-        if not self._server_process or self._server_process.poll() is not None:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            server_script = os.path.join(script_dir, "mcp-server.sh")
-            
-            # Set up environment variables
-            env = os.environ.copy()
-            env["RUST_LOG"] = "mcp_tools=debug,info"
-            env["RUST_BACKTRACE"] = "1"
-            env["LOG_DIR"] = os.path.expanduser("~/Developer/.mcp/logs")
-            env["KNOWLEDGE_GRAPH_DIR"] = os.path.expanduser("~/Developer/.mcp/knowledge_graph")
-            env["THOUGHTS_DIR"] = os.path.expanduser("~/Developer/.mcp/thoughts")
-            
-            self._server_process = subprocess.Popen(
-                [server_script],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,  # Line buffered
-                env=env
-            )
-            
-            # Wait a bit for server to start
-            time.sleep(1)
-            
-            if self._server_process.poll() is not None:
-                stderr = self._server_process.stderr.read()
-                raise MCPError(f"Server failed to start: {stderr}")
+    def _server_script(self) -> str:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        return os.path.join(script_dir, "mcp-server.sh")
 
-    def _get_next_id(self) -> int:
-        self._request_id += 1
-        return self._request_id
+    def _server_env(self) -> Dict[str, str]:
+        """Build the environment the server process is launched with"""
+        return {**os.environ, **_MCP_ENV_OVERLAY}
 
-    def _make_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        self._ensure_server_running()
-        
-        request = JsonRpcRequest(
-            method=method,
-            params=params,
-            id=self._get_next_id()
-        )
-        
-        try:
-            # Send request to server process
-            request_json = json.dumps(request.to_dict()) + "\n"
-            self._server_process.stdin.write(request_json)
-            self._server_process.stdin.flush()
-            
-            # Read response from server
-            response = self._server_process.stdout.readline()
-            if not response:
-                stderr = self._server_process.stderr.read()
-                raise MCPError(f"No response received from server. stderr: {stderr}")
-                
-            result = json.loads(response)
-            
-            if "error" in result:
-                raise ToolError(f"Tool error: {result['error']}")
-                
-            return result.get("result", {})
-        except json.JSONDecodeError as e:
-            stderr = self._server_process.stderr.read()
-            raise MCPError(f"Failed to parse server response: {e}. stderr: {stderr}")
+    def _daemon_stamp(self) -> str:
+        """Fingerprint of the build and settings a daemon started now would run with"""
+        digest = hashlib.sha256()
+        script = self._server_script()
+        binary = os.path.join(os.path.dirname(script), "target", "debug", "mcp_tools")
+        # mcp-server.sh sources .env from the caller's working directory
+        for path in (script, binary, ".env"):
+            try:
+                st = os.stat(path)
+            except OSError:
+                digest.update(b"-\0")
+            else:
+                digest.update(b"%d:%d\0" % (st.st_mtime_ns, st.st_size))
+        for key in _DAEMON_ENV_KEYS:
+            digest.update(f"{key}={os.environ.get(key, '')}\0".encode())
+        return digest.hexdigest()[:16]
+
+    def _daemon_outdated(self) -> bool:
+        """True if the recorded daemon runs another build or other settings than we would start"""
+        _, stamp = _read_daemon_pid()
+        # A daemon with no record (started by hand) is used as it is
+        return stamp is not None and stamp != self._daemon_stamp()
+
+    def _start_daemon(self) -> None:
+        """
+        Make sure a current daemon is listening on _SOCKET_PATH
+
+        Restarts a daemon that is outdated (see _daemon_outdated) and starts
+        one if nothing is listening. Only the lock holder may do either;
+        clients that waited on the lock find the new daemon listening on
+        their first retry.
+        """
+        with _daemon_lock():
+            if self._daemon_outdated():
+                _stop_daemon(self._STARTUP_TIMEOUT)
+            deadline = time.monotonic() + self._STARTUP_TIMEOUT
+            delay = 0.01
+            spawned = False
+            while True:
+                sock = _try_connect_daemon()
+                if sock is not None:
+                    sock.close()
+                    return
+                if not spawned:
+                    self._spawn_daemon()
+                    spawned = True
+                elif time.monotonic() >= deadline:
+                    raise MCPError(f"Server daemon is not listening on {_SOCKET_PATH}, see {_DAEMON_LOG}")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.25)
+
+    def _spawn_daemon(self):
+        """Start a detached server that listens on _SOCKET_PATH and record its pid"""
+        with open(_DAEMON_LOG, "ab") as log:
+            process = subprocess.Popen(
+                [self._server_script(), "--listen", _SOCKET_PATH],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                env=self._server_env(),
+                start_new_session=True
+            )
+        # mcp-server.sh execs the server, so this is the server's own pid
+        with open(_DAEMON_PID, "w") as f:
+            f.write(f"{process.pid} {self._daemon_stamp()}\n")
 
     def sequential_thinking(self, action: str, **params) -> Dict[str, Any]:
         """
@@ -124,30 +316,15 @@ class MCPClient:
         - revise: Revise an existing thought
         - branch: Create a branch from existing thought
         """
-        tool_params = {}
-        if action == "add":
-            tool_params = {
-                "content": params.get("content"),
-                "total_thoughts": int(params.get("total", 1))
-            }
-            action = "add_thought"
-        elif action == "revise":
-            tool_params = {
-                "content": params.get("content"),
-                "revises_number": int(params.get("revises"))
-            }
-            action = "revise_thought"
-        elif action == "branch":
-            tool_params = {
-                "content": params.get("content"),
-                "branch_from": int(params.get("branch_from")),
-                "branch_id": params.get("branch_id")
-            }
-            action = "branch_thought"
-            
+        dispatch = _THINK_DISPATCH.get(action)
+        if dispatch is None:
+            # Unknown actions are passed through for the server to reject
+            return self._make_request("sequential_thinking", {"action": action, "params": {}})
+
+        name, build_params = dispatch
         return self._make_request("sequential_thinking", {
-            "action": action,
-            "params": tool_params
+            "action": name,
+            "params": build_params(params)
         })
 
     def memory(self, action: str, **params) -> Dict[str, Any]:
@@ -215,10 +392,560 @@ class MCPClient:
             "params": params
         })
 
+class MCPClient(_BaseMCPClient):
+    # Initial size of the receive buffer; it doubles for longer responses
+    _READ_SIZE = 65536
+
+    def __init__(self, host: str = "localhost", port: int = 3000, daemon: bool = False):
+        super().__init__(host, port, daemon)
+        self._sock = None
+        # Receive buffer; bytes [_rx_start, _rx_end) are received but not yet consumed
+        self._rx = bytearray(self._READ_SIZE)
+        self._rx_view = memoryview(self._rx)
+        self._rx_start = self._rx_end = 0
+
+    def _ensure_server_running(self):
+        if self._daemon:
+            if self._sock is None:
+                self._connect_daemon()
+        elif not self._server_process or self._server_process.poll() is not None:
+            if self._sock is not None:
+                self._sock.close()
+            # The server talks JSON-RPC over its stdin/stdout; hand it one end
+            # of a socket pair for both instead of two pipes
+            self._sock, server_end = socket.socketpair()
+            with server_end:
+                self._server_process = subprocess.Popen(
+                    [self._server_script()],
+                    stdin=server_end,
+                    stdout=server_end,
+                    stderr=subprocess.PIPE,
+                    text=False,
+                    bufsize=0,
+                    env=self._server_env()
+                )
+            # Error paths read stderr without waiting for the server to exit
+            os.set_blocking(self._server_process.stderr.fileno(), False)
+            self._rx_start = self._rx_end = 0
+            self._handshake()
+
+    def _connect_daemon(self):
+        """Connect to the server daemon, starting or restarting it as needed"""
+        sock = None if self._daemon_outdated() else _try_connect_daemon()
+        if sock is None:
+            self._start_daemon()
+            sock = _try_connect_daemon()
+            if sock is None:
+                raise MCPError(f"Server daemon is not listening on {_SOCKET_PATH}, see {_DAEMON_LOG}")
+
+        self._sock = sock
+        self._rx_start = self._rx_end = 0
+        self._handshake()
+
+    def _shutdown(self):
+        """Close the server connection and kill the private server process, if any"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if not self._daemon and self._server_process:
+            self._server_process.kill()
+            self._server_process.wait()
+
+    def _drain_stderr(self) -> str:
+        """Return what the server has written to stderr so far, without blocking"""
+        if self._daemon:
+            # The daemon's stderr goes to its log file
+            return f"see {_DAEMON_LOG}"
+        fd = self._server_process.stderr.fileno()
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(fd, 4096)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks).decode(errors="replace")
+
+    def _handshake(self):
+        """Send `initialize` and block until the server answers it"""
+        request_id = self._next_id()
+        deadline = time.monotonic() + self._STARTUP_TIMEOUT
+
+        try:
+            self._send(*_encode_request("initialize", _INITIALIZE_PARAMS, request_id))
+            while True:
+                response = self._read_line(deadline)
+                if not response:
+                    break
+                try:
+                    result = _loads(response)
+                except json.JSONDecodeError:
+                    # Startup banner printed by mcp-server.sh
+                    continue
+                if result.get("id") == request_id:
+                    if "error" in result:
+                        self._shutdown()
+                        raise MCPError(f"Server rejected initialize: {result['error']}")
+                    return
+        except TimeoutError:
+            self._shutdown()
+            raise MCPError(f"Server did not respond within {self._STARTUP_TIMEOUT}s")
+        except ConnectionError:
+            pass
+
+        stderr = self._drain_stderr()
+        self._shutdown()
+        raise MCPError(f"Server failed to start: {stderr}")
+
+    def _send(self, *parts: bytes) -> None:
+        """Write parts to the server in a single vectored send"""
+        sent = self._sock.sendmsg(parts)
+        if sent < sum(map(len, parts)):
+            # Short send on a full socket buffer; push the remainder through
+            self._sock.sendall(memoryview(b"".join(parts))[sent:])
+
+    def _send_request(self, *parts: bytes) -> None:
+        """Start or reconnect to the server as needed and send it a request"""
+        self._ensure_server_running()
+        try:
+            self._send(*parts)
+            return
+        except OSError as e:
+            error = e
+            stderr = self._drain_stderr()
+            self._shutdown()
+
+        if self._daemon:
+            # The daemon went away since the last call; nothing was delivered,
+            # so reconnect (restarting it if needed) and send once more
+            self._ensure_server_running()
+            try:
+                self._send(*parts)
+                return
+            except OSError as e:
+                error = e
+                self._shutdown()
+        raise MCPError(f"Failed to send request to server: {error}. stderr: {stderr}") from error
+
+    def _read_line(self, deadline: Optional[float] = None) -> memoryview:
+        """
+        Read one newline-terminated message from the server (empty on EOF)
+
+        The returned view points into the receive buffer and is only valid
+        until the next read. With a deadline (a time.monotonic() value),
+        raises TimeoutError if no complete line has arrived by then.
+        """
+        sock = self._sock
+        start, end = self._rx_start, self._rx_end
+        if start == end:
+            start = end = 0
+        scan = start
+        while True:
+            newline = self._rx.find(b"\n", scan, end)
+            if newline >= 0:
+                self._rx_start, self._rx_end = newline + 1, end
+                return self._rx_view[start:newline + 1]
+
+            if end == len(self._rx):
+                if start > 0:
+                    # Move the partial line to the front to make room
+                    self._rx[:end - start] = self._rx_view[start:end]
+                else:
+                    # Line longer than the buffer; views handed out earlier
+                    # keep the old buffer alive, so grow into a new one
+                    grown = bytearray(2 * len(self._rx))
+                    grown[:end] = self._rx_view[:end]
+                    self._rx, self._rx_view = grown, memoryview(grown)
+                end -= start
+                start = 0
+            scan = end
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                    self._rx_start, self._rx_end = start, end
+                    raise TimeoutError
+            try:
+                received = sock.recv_into(self._rx_view[end:])
+            except OSError:
+                # Server exited with our request still unread
+                received = 0
+            if not received:
+                self._rx_start, self._rx_end = start, end
+                return self._rx_view[0:0]
+            end += received
+
+    def _read_response(self) -> Dict[str, Any]:
+        """Read and decode the next JSON-RPC response from the server"""
+        response = self._read_line()
+        if not response:
+            stderr = self._drain_stderr()
+            if self._daemon:
+                # Reconnect (and restart the daemon if needed) on the next call
+                self._shutdown()
+            raise MCPError(f"No response received from server. stderr: {stderr}")
+
+        try:
+            return _loads(response)
+        except json.JSONDecodeError as e:
+            stderr = self._drain_stderr()
+            raise MCPError(f"Failed to parse server response: {e}. stderr: {stderr}") from e
+
+    def _make_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = self._next_id()
+        self._send_request(*_encode_request(method, params, request_id))
+        result = self._read_response()
+        while result.get("id") != request_id:
+            if not _is_notification(result):
+                raise _unmatched_response_error(result)
+            result = self._read_response()
+        
+        if "error" in result:
+            raise ToolError(f"Tool error: {result['error']}")
+            
+        return result.get("result", {})
+
+    def batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Send several requests in a single write and return their results in order
+
+        Each call is a (method, params) pair as passed to _make_request, e.g.
+        ("brave_search", {"query": "..."}). All responses are read before a
+        ToolError is raised for the first call that failed.
+        """
+        request_ids = [self._next_id() for _ in calls]
+        self._send_request(b"".join(
+            part
+            for (method, params), request_id in zip(calls, request_ids)
+            for part in _encode_request(method, params, request_id)
+        ))
+
+        # The server may answer in any order, with progress notifications
+        # (id null) mixed in; read until every request has its response
+        pending = set(request_ids)
+        responses = {}
+        while pending:
+            result = self._read_response()
+            request_id = result.get("id")
+            if request_id in pending:
+                pending.remove(request_id)
+                responses[request_id] = result
+            elif not _is_notification(result):
+                # Some request in the batch may never be answered (the server
+                # could not parse it), so drop the connection rather than leave
+                # the rest of the replies queued for the next call
+                self._shutdown()
+                raise _unmatched_response_error(result)
+
+        results = []
+        for request_id in request_ids:
+            result = responses[request_id]
+            if "error" in result:
+                raise ToolError(f"Tool error: {result['error']}")
+            results.append(result.get("result", {}))
+        return results
+
+class AsyncMCPClient(_BaseMCPClient):
+    """
+    asyncio variant of MCPClient that pipelines requests over one server process
+
+    Requests are written as soon as they are made and responses are matched
+    back to them by id, so independent tool calls overlap instead of waiting
+    on each other's round-trip. The tool methods are the same as MCPClient's
+    but return awaitables.
+    """
+
+    # Upper bound for a single response line (scrape results can be large)
+    _STREAM_LIMIT = 16 * 1024 * 1024
+
+    def __init__(self, host: str = "localhost", port: int = 3000, daemon: bool = False):
+        super().__init__(host, port, daemon)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connection_error: Optional[MCPError] = None
+        self._start_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncMCPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _ensure_server_running(self):
+        async with self._start_lock:
+            # The reader task only finishes once the server side has gone away
+            if self._reader_task and not self._reader_task.done():
+                return
+
+            if self._daemon:
+                self._reader, self._writer = await self._connect_daemon()
+            else:
+                if self._server_process and self._server_process.returncode is None:
+                    # Left over from a connection the reader gave up on
+                    self._server_process.kill()
+                    await self._server_process.wait()
+                client_end, server_end = socket.socketpair()
+                with server_end:
+                    self._server_process = await asyncio.create_subprocess_exec(
+                        self._server_script(),
+                        stdin=server_end,
+                        stdout=server_end,
+                        stderr=asyncio.subprocess.PIPE,
+                        env=self._server_env()
+                    )
+                self._reader, self._writer = await asyncio.open_unix_connection(
+                    sock=client_end, limit=self._STREAM_LIMIT
+                )
+            self._reader_task = asyncio.create_task(self._read_responses())
+
+            try:
+                result = await asyncio.wait_for(
+                    self._call("initialize", _INITIALIZE_PARAMS), self._STARTUP_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                await self._abort_startup()
+                raise MCPError(f"Server did not respond within {self._STARTUP_TIMEOUT}s")
+            except MCPError:
+                # Connection dropped mid-handshake
+                await self._abort_startup()
+                raise
+            if "error" in result:
+                await self._abort_startup()
+                raise MCPError(f"Server rejected initialize: {result['error']}")
+
+    async def _abort_startup(self) -> None:
+        """Tear down a connection whose initialize handshake failed"""
+        self._writer.close()
+        if not self._daemon and self._server_process.returncode is None:
+            self._server_process.kill()
+            await self._server_process.wait()
+        # Closing our end lets the reader hit EOF and finish
+        await self._reader_task
+
+    async def _connect_daemon(self):
+        """Open a connection to the server daemon, starting or restarting it as needed"""
+        if not self._daemon_outdated():
+            try:
+                return await asyncio.open_unix_connection(_SOCKET_PATH, limit=self._STREAM_LIMIT)
+            except (FileNotFoundError, ConnectionRefusedError):
+                pass
+
+        # Blocks on the daemon lock, so keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self._start_daemon)
+        try:
+            return await asyncio.open_unix_connection(_SOCKET_PATH, limit=self._STREAM_LIMIT)
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise MCPError(f"Server daemon is not listening on {_SOCKET_PATH}, see {_DAEMON_LOG}") from None
+
+    async def _read_responses(self) -> None:
+        """Resolve pending requests as their responses arrive, in any order"""
+        error = None
+        try:
+            while True:
+                try:
+                    response = await self._reader.readline()
+                except ConnectionError:
+                    # Server exited with our requests still unread (or a write
+                    # to it failed first and the transport reports that here)
+                    break
+                except ValueError:
+                    # readline dropped a line over _STREAM_LIMIT; whichever request
+                    # it answered would never resolve, so give up on the connection
+                    error = MCPError(f"Server response exceeded {self._STREAM_LIMIT} bytes")
+                    break
+                if not response:
+                    break
+                try:
+                    result = _loads(response)
+                except json.JSONDecodeError:
+                    # Not a JSON-RPC message (e.g. the launcher's startup banner)
+                    continue
+                if not isinstance(result, dict):
+                    # Valid JSON, but not a JSON-RPC message either
+                    continue
+                future = self._pending.pop(result.get("id"), None)
+                if future is not None:
+                    if not future.done():
+                        future.set_result(result)
+                elif "error" in result:
+                    # An error we cannot route (the server could not parse one
+                    # of our requests); that request would wait forever
+                    error = _unmatched_response_error(result)
+                    break
+        except asyncio.CancelledError:
+            error = MCPError("Server connection closed")
+            raise
+        except Exception as e:
+            error = MCPError(f"Failed to read server response: {e!r}")
+        finally:
+            if error is not None:
+                # The server may still be running; stop it so the next call
+                # starts afresh instead of leaving it behind
+                self._writer.close()
+                if not self._daemon and self._server_process.returncode is None:
+                    self._server_process.kill()
+            elif self._daemon:
+                error = MCPError(f"No response received from server. stderr: see {_DAEMON_LOG}")
+            else:
+                stderr = (await self._server_process.stderr.read()).decode(errors="replace")
+                error = MCPError(f"No response received from server. stderr: {stderr}")
+            self._connection_error = error
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def _call(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request and wait for its raw JSON-RPC response"""
+        if self._reader_task.done():
+            # The server went away before this request could be registered
+            raise self._connection_error or MCPError("Server connection closed")
+        request_id = self._next_id()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            try:
+                self._writer.writelines(_encode_request(method, params, request_id))
+                await self._writer.drain()
+            except ConnectionError:
+                # The server went away; the reader task fails the future with its stderr
+                pass
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _make_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        await self._ensure_server_running()
+
+        result = await self._call(method, params)
+        if "error" in result:
+            raise ToolError(f"Tool error: {result['error']}")
+
+        return result.get("result", {})
+
+    async def batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Send several requests in a single write and return their results in order
+
+        Takes the same (method, params) pairs as MCPClient.batch. All
+        responses are awaited before a ToolError is raised for the first
+        call that failed.
+        """
+        await self._ensure_server_running()
+        if self._reader_task.done():
+            raise self._connection_error or MCPError("Server connection closed")
+
+        loop = asyncio.get_running_loop()
+        request_ids = [self._next_id() for _ in calls]
+        futures = []
+        for request_id in request_ids:
+            futures.append(loop.create_future())
+            self._pending[request_id] = futures[-1]
+
+        try:
+            try:
+                self._writer.writelines(
+                    part
+                    for (method, params), request_id in zip(calls, request_ids)
+                    for part in _encode_request(method, params, request_id)
+                )
+                await self._writer.drain()
+            except ConnectionError:
+                # The server went away; the reader task fails the futures with its stderr
+                pass
+            responses = await asyncio.gather(*futures)
+        finally:
+            for request_id in request_ids:
+                self._pending.pop(request_id, None)
+
+        results = []
+        for result in responses:
+            if "error" in result:
+                raise ToolError(f"Tool error: {result['error']}")
+            results.append(result.get("result", {}))
+        return results
+
+    async def gather(self, *calls) -> List[Dict[str, Any]]:
+        """
+        Run several tool calls concurrently and return their results in order
+
+        Example:
+            think, hits = await client.gather(
+                client.sequential_thinking("add", content="..."),
+                client.brave_search("..."),
+            )
+        """
+        return list(await asyncio.gather(*calls))
+
+    async def close(self) -> None:
+        """Shut down the server connection (and private server process) and stop the response reader"""
+        if self._writer:
+            self._writer.close()
+            # A connection the server reset reports that again here; it is closed either way
+            with contextlib.suppress(ConnectionError):
+                await self._writer.wait_closed()
+        if not self._daemon and self._server_process:
+            await self._server_process.wait()
+        if self._reader_task:
+            await self._reader_task
+            self._reader_task = None
+
+class MCPPool:
+    """
+    Fixed-size pool of AsyncMCPClient connections to the shared server daemon
+
+    Every client connects to the one daemon on _SOCKET_PATH (started on
+    first use), so all of them see the same server state: a task started
+    through one client is visible through the others, and stateful tools
+    such as task_planning never have two processes saving over each other.
+    Calls made through different clients still run in parallel, since the
+    daemon serves each connection independently. Connections are opened
+    lazily on a client's first request.
+
+    Example:
+        async with MCPPool(size=4) as pool:
+            async with pool.acquire() as client:
+                await client.graph_tool("get_node", name="root")
+    """
+
+    def __init__(self, size: int = 4):
+        self._clients = [AsyncMCPClient(daemon=True) for _ in range(size)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for client in self._clients:
+            self._idle.put_nowait(client)
+
+    async def __aenter__(self) -> "MCPPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        """Borrow an idle client, waiting for one if all are in use"""
+        client = await self._idle.get()
+        try:
+            yield client
+        finally:
+            self._idle.put_nowait(client)
+
+    async def close(self) -> None:
+        """Close every client's connection; the daemon keeps running"""
+        await asyncio.gather(*(client.close() for client in self._clients))
+
 def create_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="MCP Client - Command line interface for MCP tools")
     parser.add_argument("--host", default="localhost", help="MCP server host")
     parser.add_argument("--port", type=int, default=3000, help="MCP server port")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Use a shared background server, starting it on first use")
+    parser.add_argument("--stop-daemon", action="store_true",
+                        help="Stop the shared background server and exit")
     
     subparsers = parser.add_subparsers(dest="tool", help="MCP tool to use")
     
@@ -286,44 +1013,124 @@ def create_parser() -> argparse.ArgumentParser:
 
     return parser
 
-def main():
-    parser = argparse.ArgumentParser(description='MCP Client')
-    subparsers = parser.add_subparsers(dest='command')
+# `think` options as (flag -> (dest, type, required)), mirroring create_parser
+_THINK_OPTIONS = {
+    "add": {"--content": ("content", str, True), "--total": ("total", int, False)},
+    "revise": {"--content": ("content", str, True), "--revises": ("revises", int, True)},
+    "branch": {
+        "--content": ("content", str, True),
+        "--branch-from": ("branch_from", int, True),
+        "--branch-id": ("branch_id", str, True),
+    },
+}
+_THINK_DEFAULTS = {"add": {"total": 1}}
 
-    # Sequential thinking
-    think_parser = subparsers.add_parser('think')
-    think_subparsers = think_parser.add_subparsers(dest='action')
+@functools.lru_cache(maxsize=None)
+def _get_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser on first use and reuse it afterwards"""
+    return create_parser()
 
-    # Add thought
-    add_parser = think_subparsers.add_parser('add')
-    add_parser.add_argument('--content', required=True, help='Content of the thought')
-    add_parser.add_argument('--total', type=int, default=1, help='Total number of thoughts')
+def _parse_think_fast(argv: List[str]) -> Optional[argparse.Namespace]:
+    """
+    Parse `think <action> --flag value ...` without building the argparse tree
 
-    # Revise thought
-    revise_parser = think_subparsers.add_parser('revise')
-    revise_parser.add_argument('--content', required=True, help='Content of the thought')
-    revise_parser.add_argument('--revises', type=int, required=True, help='Number of thought to revise')
+    Returns None for anything outside that exact shape (help, global options,
+    unknown or missing flags, --flag=value, values starting with "-") so the
+    caller falls back to argparse, which then validates and reports errors.
+    """
+    if len(argv) < 2 or argv[0] != "think" or argv[1] not in _THINK_OPTIONS:
+        return None
+    options = _THINK_OPTIONS[argv[1]]
+    flags = argv[2:]
+    if len(flags) % 2:
+        return None
 
-    # Branch thought
-    branch_parser = think_subparsers.add_parser('branch')
-    branch_parser.add_argument('--content', required=True, help='Content of the thought')
-    branch_parser.add_argument('--branch-from', type=int, required=True, help='Thought number to branch from')
-    branch_parser.add_argument('--branch-id', required=True, help='Branch identifier')
-
-    args = parser.parse_args()
-    client = MCPClient()
-
-    if args.command == 'think':
-        if args.action == 'add':
-            result = client.sequential_thinking('add', content=args.content, total=args.total)
-        elif args.action == 'revise':
-            result = client.sequential_thinking('revise', content=args.content, revises=args.revises)
-        elif args.action == 'branch':
-            result = client.sequential_thinking('branch', content=args.content, branch_from=args.branch_from, branch_id=args.branch_id)
-        else:
-            print("Unknown action")
-            return
-        print(json.dumps(result, indent=2))
+    values = dict(_THINK_DEFAULTS.get(argv[1], {}))
+    for flag, raw in zip(flags[::2], flags[1::2]):
+        spec = options.get(flag)
+        if spec is None or raw.startswith("-"):
+            return None
+        dest, kind, _ = spec
+        try:
+            values[dest] = kind(raw)
+        except ValueError:
+            return None
+
+    if any(required and dest not in values for dest, _, required in options.values()):
+        return None
+    return argparse.Namespace(host="localhost", port=3000, daemon=False, stop_daemon=False, tool="think", action=argv[1], **values)
+
+def _options(args: argparse.Namespace, *names: str) -> Dict[str, Any]:
+    """Collect the named CLI options that were actually supplied"""
+    return {name: getattr(args, name) for name in names if getattr(args, name) is not None}
+
+_MEMORY_OPTIONS = ("thought", "tags", "from_thought", "to_thought", "relation", "query")
+_GRAPH_OPTIONS = ("name", "description", "content", "parent", "relation")
+_TASK_OPTIONS = ("title", "description", "priority", "status", "task_id")
+_GIT_OPTIONS = ("files", "message")
+
+# (tool, action) -> handler(client, args); tools without actions use None
+_HANDLERS = {
+    ("think", "add"): lambda c, a: c.sequential_thinking("add", content=a.content, total=a.total),
+    ("think", "revise"): lambda c, a: c.sequential_thinking("revise", content=a.content, revises=a.revises),
+    ("think", "branch"): lambda c, a: c.sequential_thinking(
+        "branch", content=a.content, branch_from=a.branch_from, branch_id=a.branch_id
+    ),
+    ("memory", "memorize"): lambda c, a: c.memory("memorize_thought", **_options(a, *_MEMORY_OPTIONS)),
+    ("memory", "connect"): lambda c, a: c.memory("connect_thoughts", **_options(a, *_MEMORY_OPTIONS)),
+    ("memory", "search"): lambda c, a: c.memory("search_memory", **_options(a, *_MEMORY_OPTIONS)),
+    ("graph", "create-root"): lambda c, a: c.graph_tool("create_root", **_options(a, *_GRAPH_OPTIONS)),
+    ("graph", "create-node"): lambda c, a: c.graph_tool("create_node", **_options(a, *_GRAPH_OPTIONS)),
+    ("graph", "get"): lambda c, a: c.graph_tool("get_node", **_options(a, *_GRAPH_OPTIONS)),
+    ("graph", "search"): lambda c, a: c.graph_tool("search_nodes", **_options(a, *_GRAPH_OPTIONS)),
+    ("task", "create"): lambda c, a: c.task_planning("create_task", **_options(a, *_TASK_OPTIONS)),
+    ("task", "update"): lambda c, a: c.task_planning("update_task", **_options(a, *_TASK_OPTIONS)),
+    ("task", "get"): lambda c, a: c.task_planning("get_task", **_options(a, *_TASK_OPTIONS)),
+    ("search", None): lambda c, a: c.brave_search(a.query),
+    ("scrape", None): lambda c, a: c.scrape_url(a.url),
+    ("git", "init"): lambda c, a: c.git("init_repo", **_options(a, *_GIT_OPTIONS)),
+    ("git", "add"): lambda c, a: c.git("add_files", **_options(a, *_GIT_OPTIONS)),
+    ("git", "commit"): lambda c, a: c.git("commit_changes", **_options(a, *_GIT_OPTIONS)),
+}
+
+def _write_result(result: Any) -> None:
+    """Print a result as JSON: indented on a terminal, compact when piped"""
+    pretty = sys.stdout.isatty()
+    if orjson is not None:
+        data = orjson.dumps(result, option=orjson.OPT_INDENT_2 if pretty else 0)
+    else:
+        data = json.dumps(result, indent=2 if pretty else None).encode()
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.write(b"\n")
+
+def main():
+    args = _parse_think_fast(sys.argv[1:])
+    if args is None:
+        args = _get_parser().parse_args()
+
+    if args.stop_daemon:
+        with _daemon_lock():
+            if _stop_daemon():
+                message = "Server daemon stopped"
+            else:
+                sock = _try_connect_daemon()
+                if sock is None:
+                    message = "No server daemon running"
+                else:
+                    sock.close()
+                    message = f"The server on {_SOCKET_PATH} was not started by this client; stop it by hand"
+        print(message, file=sys.stderr)
+        return
+
+    handler = _HANDLERS.get((args.tool, getattr(args, "action", None)))
+    if handler is None:
+        # Subcommands are optional in argparse; report them missing the way it
+        # reports other bad arguments (usage on stderr, exit status 2)
+        if args.tool is None:
+            _get_parser().error("a tool is required")
+        _get_parser().error(f"{args.tool}: an action is required")
+
+    _write_result(handler(MCPClient(daemon=args.daemon), args))
 
 if __name__ == "__main__":
     main()
@@ -25,7 +25,7 @@ use shared_protocol_objects::{
 };
 use std::collections::HashMap;
 use std::sync::Arc;
-use tokio::io::{stdout, AsyncBufReadExt, AsyncWriteExt, BufReader};
+use tokio::io::{stdout, AsyncBufReadExt, AsyncRead, AsyncWrite, AsyncWriteExt, BufReader};
 use tokio::sync::{mpsc, Mutex};
 use tokio::{io, task};
 use tokio_stream::wrappers::LinesStream;
@@ -95,10 +95,71 @@ async fn main() {
         long_running_manager: my_manager,
     }));
 
+    // `--listen <socket path>` keeps the server running as a shared daemon;
+    // otherwise serve a single client over stdio as before
+    let listen_path = std::env::args().skip_while(|arg| arg != "--listen").nth(1);
+
+    match listen_path {
+        Some(path) => serve_unix_socket(&path, state).await,
+        None => serve_connection(io::stdin(), stdout(), state).await,
+    }
+}
+
+#[cfg(unix)]
+async fn serve_unix_socket(path: &str, state: Arc<Mutex<MCPServerState>>) {
+    // Never take over a live socket: if another daemon answers, leave it be.
+    // Only a stale file left behind by a dead daemon is removed before bind.
+    match std::os::unix::net::UnixStream::connect(path) {
+        Ok(_) => {
+            info!("Another server is already listening on {}, exiting", path);
+            return;
+        }
+        Err(e) if e.kind() == std::io::ErrorKind::ConnectionRefused => {
+            let _ = std::fs::remove_file(path);
+        }
+        Err(_) => {}
+    }
+    let listener = match tokio::net::UnixListener::bind(path) {
+        Ok(listener) => listener,
+        Err(e) => {
+            error!("Failed to listen on {}: {}", path, e);
+            return;
+        }
+    };
+    info!("Listening on {}", path);
+
+    loop {
+        match listener.accept().await {
+            Ok((stream, _)) => {
+                debug!("Client connected");
+                let state = Arc::clone(&state);
+                tokio::spawn(async move {
+                    let (reader, writer) = stream.into_split();
+                    serve_connection(reader, writer, state).await;
+                    debug!("Client disconnected");
+                });
+            }
+            Err(e) => error!("Failed to accept connection: {}", e),
+        }
+    }
+}
+
+#[cfg(not(unix))]
+async fn serve_unix_socket(path: &str, _state: Arc<Mutex<MCPServerState>>) {
+    error!("Cannot listen on {}: unix sockets are not supported on this platform", path);
+}
+
+// Read newline-delimited JSON-RPC requests from `input` and write responses to
+// `output` until the client closes its side
+async fn serve_connection<R, W>(input: R, output: W, state: Arc<Mutex<MCPServerState>>)
+where
+    R: AsyncRead + Unpin,
+    W: AsyncWrite + Unpin + Send + 'static,
+{
     let (tx_out, mut rx_out) = mpsc::unbounded_channel::<JsonRpcResponse>();
 
     let printer_handle = tokio::spawn(async move {
-        let mut out = stdout();
+        let mut out = output;
         while let Some(resp) = rx_out.recv().await {
             let serialized = serde_json::to_string(&resp).unwrap();
             debug!("Sending response: {}", serialized);
@@ -108,8 +169,7 @@ async fn main() {
         }
     });
 
-    let stdin = io::stdin();
-    let reader = BufReader::new(stdin);
+    let reader = BufReader::new(input);
     let lines = reader.lines();
     let mut lines = LinesStream::new(lines);
 